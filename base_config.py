@@ -2,13 +2,18 @@ import aiohttp
 import asyncio
 from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram import InlineQueryResultArticle, InputTextMessageContent
+from telegram.error import RetryAfter
+from telegram.ext import Application, CommandHandler, InlineQueryHandler, MessageHandler, filters
 import logging
 from logging.handlers import RotatingFileHandler
 import signal
 import os
 import json
 import sys
+import time
+import bisect
+import functools
 
 # Windows에서 UTF-8 사용
 if sys.platform.startswith('win'):
@@ -32,9 +37,26 @@ SCHEDULE_FILE = 'schedules.json'  # 예약 메시지 저장
 
 # 기본 설정 생성
 DEFAULT_CONFIG = {
-    "coins": ["BTC", "ETH", "SOL"]
+    "coins": ["BTC", "ETH", "SOL"],
+    "interval": "1h"
 }
 
+# 정기 리포트 주기별 cron 설정 (주기마다 하나의 공용 작업으로 실행)
+REPORT_INTERVALS = {
+    "15m": {"minute": "14,29,44,59"},
+    "1h": {"minute": 59},
+    "8h": {"hour": "7,15,23", "minute": 59, "timezone": "UTC"},  # 펀딩 정산(00/08/16 UTC) 직전
+}
+
+# 인라인 조회 설정
+REPORT_SEND_RETRIES = 3        # 텔레그램 전송 제한(RetryAfter) 시 재시도 횟수
+
+SNAPSHOT_REFRESH_SECONDS = 30  # 시장 스냅샷 캐시 갱신 주기
+SNAPSHOT_REUSE_SECONDS = 10    # 이 시간 내의 스냅샷은 재조회 없이 재사용
+SNAPSHOT_MAX_AGE_SECONDS = 120 # 이보다 오래된 스냅샷은 지연 데이터로 표시
+INLINE_CACHE_TIME = 30         # 텔레그램 측 인라인 결과 캐시 시간 (초)
+INLINE_RESULT_LIMIT = 20       # 인라인 결과 최대 개수
+
 def ensure_directories():
     """필요한 디렉토리 생성"""
     if not os.path.exists(LOG_DIR):
@@ -70,6 +92,7 @@ def register_user(user_id, username=None):
     if user_id not in users:
         users[user_id] = {
             "coins": DEFAULT_CONFIG["coins"].copy(),
+            "interval": DEFAULT_CONFIG["interval"],
             "username": username,
             "joined_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
@@ -94,6 +117,22 @@ def update_user_coins(user_id, coins):
         users[user_id]["coins"] = coins
         save_users(users)
 
+def get_user_interval(user_id):
+    """사용자의 리포트 주기 조회"""
+    users = load_users()
+    user_id = str(user_id)
+    if user_id in users:
+        return users[user_id].get("interval", DEFAULT_CONFIG["interval"])
+    return register_user(user_id)["interval"]
+
+def update_user_interval(user_id, interval):
+    """사용자의 리포트 주기 업데이트"""
+    users = load_users()
+    user_id = str(user_id)
+    if user_id in users:
+        users[user_id]["interval"] = interval
+        save_users(users)
+
 def load_schedules():
     """예약된 메시지 로드"""
     try:
@@ -144,6 +183,26 @@ def setup_logging():
 # 전역 로거 설정
 logger = setup_logging()
 
+# 핸들러별 응답 시간 통계 (초 단위)
+HANDLER_LATENCY = {}
+
+def measure_latency(func):
+    """핸들러 실행 시간을 HANDLER_LATENCY에 기록"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = HANDLER_LATENCY.setdefault(
+                func.__name__, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+    return wrapper
+
 # 이모지 매핑
 EMOJI_MAP = {
     'BTC': '₿',
@@ -153,48 +212,27 @@ EMOJI_MAP = {
 
 class APIHelper:
     @staticmethod
-    async def get_coin_data(session, coin):
-        """특정 코인의 데이터 조회"""
+    async def get_market_snapshot(session):
+        """전체 코인의 펀딩비/가격 스냅샷 조회 (API 1회 호출)"""
         try:
             payload = {"type": "metaAndAssetCtxs"}
             async with session.post(BASE_URL, json=payload) as response:
                 if response.status == 200:
                     data = await response.json()
-                    market_data = data[1]
                     universe = data[0]['universe']
-                    
-                    for i, asset in enumerate(universe):
-                        if asset['name'] == coin:
-                            funding_rate = float(market_data[i]['funding']) * 100
-                            price = float(market_data[i]['markPx'])
-                            return {
-                                'funding_rate': funding_rate,
-                                'price': price,
-                                'exists': True,
-                                'error': None
-                            }
-                    
-                    return {
-                        'funding_rate': 0,
-                        'price': 0,
-                        'exists': False,
-                        'error': None
-                    }
-                else:
+                    market_data = data[1]
                     return {
-                        'funding_rate': 0,
-                        'price': 0,
-                        'exists': False,
-                        'error': 'API 응답 오류'
+                        asset['name']: {
+                            'funding_rate': float(ctx['funding']) * 100,
+                            'price': float(ctx['markPx'])
+                        }
+                        for asset, ctx in zip(universe, market_data)
                     }
+                logger.error(f"스냅샷 API 응답 오류: {response.status}")
+                return None
         except Exception as e:
-            logger.error(f"API 호출 중 오류: {str(e)}")
-            return {
-                'funding_rate': 0,
-                'price': 0,
-                'exists': False,
-                'error': str(e)
-            }
+            logger.error(f"스냅샷 조회 중 오류: {str(e)}")
+            return None
 
     @staticmethod
     async def verify_coin(session, coin):
@@ -215,6 +253,29 @@ def get_emoji(coin):
     """코인별 이모지 반환"""
     return EMOJI_MAP.get(coin, '🪙')
 
+def get_apr(funding_rate):
+    """시간당 펀딩비(%)를 연환산 APR(%)로 변환"""
+    return funding_rate * 24 * 365
+
+def format_coin_card(coin, data):
+    """코인별 펀딩비/가격/APR 카드 문자열 생성"""
+    funding_rate = data['funding_rate']
+    apr = get_apr(funding_rate)
+    price = data['price']
+    
+    # 가격 표시 형식을 코인별로 다르게 설정
+    if coin in ['BTC']:
+        price_format = f"${price:,.2f}"
+    else:
+        price_format = f"${price:,.3f}"
+    
+    return (
+        f"{get_emoji(coin)} {coin}\n"
+        f"가격: {price_format}\n"
+        f"현재 펀딩비: {funding_rate:+.6f}%\n"
+        f"예상 APR: {apr:+.2f}%"
+    )
+
 # 테스트용 코드
 if __name__ == "__main__":
     print("기본 설정이 완료되었습니다.")
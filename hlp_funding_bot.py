@@ -5,6 +5,13 @@ class FundingBot:
         self.scheduler = AsyncIOScheduler()
         self._running = False
         self.application = None
+        self.report_buckets = {interval: set() for interval in REPORT_INTERVALS}
+        self.user_intervals = {}
+        self.market_snapshot = {}
+        self.snapshot_time = None
+        self.snapshot_lock = asyncio.Lock()
+        self.report_lock = asyncio.Lock()
+        self.universe = []
         
     async def start(self):
         """봇 초기화 및 시작"""
@@ -17,12 +24,17 @@ class FundingBot:
         self.application.add_handler(CommandHandler("remove", self.remove_coin))
         self.application.add_handler(CommandHandler("list", self.list_coins))
         self.application.add_handler(CommandHandler("check", self.check_now))
+        self.application.add_handler(CommandHandler("every", self.set_interval))
         
         # 관리자 커맨드 핸들러 등록
         self.application.add_handler(CommandHandler("userlist", self.admin_list_users))
         self.application.add_handler(CommandHandler("send", self.admin_send))
         self.application.add_handler(CommandHandler("markdown", self.admin_markdown))
         self.application.add_handler(CommandHandler("schedule", self.admin_schedule))
+        self.application.add_handler(CommandHandler("latency", self.admin_latency))
+        
+        # 인라인 조회 핸들러
+        self.application.add_handler(InlineQueryHandler(self.inline_query))
         
         # 미디어 핸들러
         self.application.add_handler(MessageHandler(
@@ -36,6 +48,7 @@ class FundingBot:
         
         logger.info("봇이 시작되었습니다.")
 
+    @measure_latency
     async def help_command(self, update, context):
         """도움말 표시"""
         help_text = (
@@ -46,6 +59,8 @@ class FundingBot:
             "/remove [코인심볼] - 코인 제거 (예: /remove BTC)\n"
             "/list - 현재 모니터링 중인 코인 목록 표시\n"
             "/check - 즉시 펀딩비 확인\n"
+            f"/every [{'|'.join(REPORT_INTERVALS)}] - 정기 알림 주기 설정 (예: /every 8h)\n"
+            f"@{context.bot.username} [코인심볼] - 아무 대화창에서 인라인으로 펀딩비 조회 (예: @{context.bot.username} SOL)\n"
         )
         
         if is_admin(update.message.chat_id):
@@ -55,11 +70,13 @@ class FundingBot:
                 "/send [USER_ID] [메시지] - 특정 사용자에게 메시지 전송\n"
                 "/markdown [USER_ID] [메시지] - 서식 있는 메시지 전송\n"
                 "/schedule [날짜] [시간] [USER_ID] [메시지] - 예약 전송\n"
+                "/latency - 핸들러별 응답 시간 통계\n"
                 "이미지/파일 전송 - 미디어에 캡션으로 /send [USER_ID] 입력"
             )
         
         await update.message.reply_text(help_text)
 
+    @measure_latency
     async def start_command(self, update, context):
         """시작 메시지 및 사용자 등록"""
         user_id = update.message.chat_id
@@ -74,6 +91,7 @@ class FundingBot:
         )
         await update.message.reply_text(welcome_text)
 
+    @measure_latency
     async def admin_list_users(self, update, context):
         """관리자용: 사용자 목록 보기"""
         if not is_admin(update.message.chat_id):
@@ -99,6 +117,7 @@ class FundingBot:
         
         await update.message.reply_text(message, parse_mode='Markdown')
 
+    @measure_latency
     async def admin_send(self, update, context):
         """관리자용: 특정 사용자에게 메시지 전송"""
         if not is_admin(update.message.chat_id):
@@ -123,6 +142,7 @@ class FundingBot:
         except Exception as e:
             await update.message.reply_text(f"❌ 전송 실패: {str(e)}")
 
+    @measure_latency
     async def admin_markdown(self, update, context):
         """관리자용: 마크다운/HTML 형식 메시지 전송"""
         if not is_admin(update.message.chat_id):
@@ -151,6 +171,7 @@ class FundingBot:
             await update.message.reply_text("✅ 메시지 전송 완료")
         except Exception as e:
             await update.message.reply_text(f"❌ 형식 오류: {str(e)}")
+    @measure_latency
     async def handle_admin_media(self, update, context):
         """관리자의 미디어 파일 전송 처리"""
         if not is_admin(update.message.chat_id):
@@ -188,6 +209,7 @@ class FundingBot:
         except Exception as e:
             await update.message.reply_text(f"❌ 전송 실패: {str(e)}")
 
+    @measure_latency
     async def admin_schedule(self, update, context):
         """관리자용: 메시지 예약 전송"""
         if not is_admin(update.message.chat_id):
@@ -238,6 +260,24 @@ class FundingBot:
         except Exception as e:
             await update.message.reply_text(f"❌ 예약 실패: {str(e)}")
 
+    @measure_latency
+    async def admin_latency(self, update, context):
+        """관리자용: 핸들러별 응답 시간 통계 보기"""
+        if not is_admin(update.message.chat_id):
+            return
+            
+        if not HANDLER_LATENCY:
+            await update.message.reply_text("아직 기록된 응답 시간이 없습니다.")
+            return
+            
+        message = "⏱ 핸들러별 응답 시간:\n\n"
+        for name, stats in sorted(HANDLER_LATENCY.items()):
+            avg_ms = stats["total"] / stats["count"] * 1000
+            max_ms = stats["max"] * 1000
+            message += f"{name}: {stats['count']}회, 평균 {avg_ms:.1f}ms, 최대 {max_ms:.1f}ms\n"
+        
+        await update.message.reply_text(message)
+
     async def send_scheduled_message(self, target_id, message):
         """예약 메시지 전송"""
         try:
@@ -249,6 +289,7 @@ class FundingBot:
         except Exception as e:
             logger.error(f"예약 메시지 전송 실패: {str(e)}")
 
+    @measure_latency
     async def add_coin(self, update, context):
         """코인 추가 커맨드 핸들러"""
         user_id = update.message.chat_id
@@ -288,6 +329,7 @@ class FundingBot:
         )
         logger.info(f"코인 추가됨: {coin} (사용자: {user_id})")
 
+    @measure_latency
     async def remove_coin(self, update, context):
         """코인 제거 커맨드 핸들러"""
         user_id = update.message.chat_id
@@ -317,6 +359,7 @@ class FundingBot:
         )
         logger.info(f"코인 제거됨: {coin} (사용자: {user_id})")
 
+    @measure_latency
     async def list_coins(self, update, context):
         """모니터링 중인 코인 목록 표시"""
         user_id = update.message.chat_id
@@ -337,6 +380,60 @@ class FundingBot:
             "명령어를 사용하세요."
         )
 
+    @measure_latency
+    async def set_interval(self, update, context):
+        """정기 알림 주기 설정"""
+        user_id = update.message.chat_id
+        current = get_user_interval(user_id)
+        options = "|".join(REPORT_INTERVALS)
+        
+        if not context.args:
+            await update.message.reply_text(
+                f"⚠️ 사용법: /every {options}\n"
+                "예시: /every 8h\n\n"
+                f"현재 알림 주기: {current}"
+            )
+            return
+            
+        interval = context.args[0].lower()
+        if interval not in REPORT_INTERVALS:
+            await update.message.reply_text(
+                f"❌ {interval}은(는) 지원하지 않는 주기입니다.\n"
+                f"선택 가능한 주기: {options}"
+            )
+            return
+            
+        self.assign_bucket(user_id, interval)
+        update_user_interval(user_id, interval)
+        await update.message.reply_text(
+            f"✅ 알림 주기가 {interval}(으)로 변경되었습니다."
+        )
+        logger.info(f"알림 주기 변경됨: {current} -> {interval} (사용자: {user_id})")
+
+    def load_report_buckets(self):
+        """저장된 사용자별 주기로 리포트 버킷 구성"""
+        self.report_buckets = {interval: set() for interval in REPORT_INTERVALS}
+        self.user_intervals = {}
+        self.sync_report_buckets(load_users())
+
+    def sync_report_buckets(self, users):
+        """버킷에 없는 사용자를 저장된 주기의 버킷에 추가"""
+        for uid, data in users.items():
+            if uid not in self.user_intervals:
+                self.assign_bucket(uid, data.get("interval", DEFAULT_CONFIG["interval"]))
+
+    def assign_bucket(self, user_id, interval):
+        """사용자를 해당 주기 버킷으로 이동"""
+        user_id = str(user_id)
+        if interval not in REPORT_INTERVALS:
+            interval = DEFAULT_CONFIG["interval"]
+        previous = self.user_intervals.get(user_id)
+        if previous is not None:
+            self.report_buckets[previous].discard(user_id)
+        self.report_buckets[interval].add(user_id)
+        self.user_intervals[user_id] = interval
+
+    @measure_latency
     async def check_now(self, update, context):
         """즉시 펀딩비 확인"""
         user_id = update.message.chat_id
@@ -357,62 +454,164 @@ class FundingBot:
         try:
             coins = get_user_coins(user_id)
             async with aiohttp.ClientSession() as session:
-                results = []
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-                results.append(f"🕒 {current_time}")
-                
-                for coin in sorted(coins):
-                    data = await APIHelper.get_coin_data(session, coin)
-                    
-                    if data['error']:
-                        results.append(f"\n❌ {coin} 데이터 조회 중 오류가 발생했습니다")
-                        continue
-                        
-                    if not data['exists']:
-                        results.append(f"\n❌ {coin} 데이터를 찾을 수 없습니다")
-                        continue
-                        
-                    funding_rate = data['funding_rate']
-                    apr = funding_rate * 24 * 365
-                    price = data['price']
-                    
-                    # 가격 표시 형식을 코인별로 다르게 설정
-                    if coin in ['BTC']:
-                        price_format = f"${price:,.2f}"
-                    else:
-                        price_format = f"${price:,.3f}"
-                    
-                    results.append(
-                        f"\n{get_emoji(coin)} {coin}\n"
-                        f"가격: {price_format}\n"
-                        f"현재 펀딩비: {funding_rate:+.6f}%\n"
-                        f"예상 APR: {apr:+.2f}%"
-                    )
-                
-                return "".join(results)
+                snapshot = await APIHelper.get_market_snapshot(session)
+            self.update_snapshot(snapshot)
+            return self.build_funding_message(coins, snapshot)
                 
         except Exception as e:
             logger.error(f"펀딩비 조회 중 오류: {str(e)}")
             return "❌ 데이터 조회 중 오류가 발생했습니다."
 
-    async def send_funding_rate(self, user_id=None):
-        """펀딩비 메시지 전송"""
-        if not self._running and user_id is None:
+    def build_funding_message(self, coins, snapshot):
+        """시장 스냅샷으로 펀딩비 메시지 생성"""
+        if snapshot is None:
+            return "❌ 데이터 조회 중 오류가 발생했습니다."
+            
+        results = []
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
+        results.append(f"🕒 {current_time}")
+        
+        for coin in sorted(coins):
+            data = snapshot.get(coin)
+            if data is None:
+                results.append(f"\n❌ {coin} 데이터를 찾을 수 없습니다")
+                continue
+            results.append(f"\n{format_coin_card(coin, data)}")
+        
+        return "".join(results)
+
+    async def send_bucket_report(self, interval):
+        """주기 버킷 리포트 전송 (스냅샷 1회 조회 후 버킷 사용자 전체에 전송)"""
+        if not self._running:
             return
             
-        try:
+        # 같은 분에 실행되는 버킷들은 순서대로 전송하여 전송 제한을 넘지 않도록 함
+        async with self.report_lock:
+            # 어떤 경로로 등록됐든 신규 사용자를 버킷에 반영
             users = load_users()
-            if user_id is not None:
-                # 특정 사용자에게만 전송
-                message = await self.get_funding_rates(user_id)
+            self.sync_report_buckets(users)
+            
+            bucket = list(self.report_buckets.get(interval, ()))
+            if not bucket:
+                return
+                
+            snapshot = await self.get_snapshot()
+            if snapshot is None:
+                logger.error(f"시세 스냅샷이 없어 {interval} 리포트 전송을 건너뜁니다.")
+                return
+            
+            for uid in bucket:
+                try:
+                    coins = users.get(uid, {}).get("coins", [])
+                    message = self.build_funding_message(coins, snapshot)
+                    await self.send_report_message(uid, message)
+                    logger.info(f"메시지 전송 완료 (사용자: {uid}, 주기: {interval}):\n{message}")
+                except Exception as e:
+                    logger.error(f"메시지 전송 중 오류 (사용자: {uid}): {str(e)}")
+
+    async def send_report_message(self, user_id, message):
+        """리포트 메시지 전송 (전송 제한 시 안내된 시간만큼 대기 후 재시도)"""
+        for attempt in range(REPORT_SEND_RETRIES):
+            try:
                 await self.application.bot.send_message(chat_id=user_id, text=message)
-                logger.info(f"메시지 전송 완료 (사용자: {user_id}):\n{message}")
-            else:
-                # 모든 사용자에게 전송
-                for uid in users.keys():
-                    message = await self.get_funding_rates(uid)
-                    await self.application.bot.send_message(chat_id=uid, text=message)
-                    logger.info(f"메시지 전송 완료 (사용자: {uid}):\n{message}")
+                return
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if hasattr(retry_after, 'total_seconds'):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"전송 제한으로 {retry_after}초 대기 (사용자: {user_id})")
+                await asyncio.sleep(retry_after)
+        await self.application.bot.send_message(chat_id=user_id, text=message)
+
+    async def get_snapshot(self):
+        """최근 스냅샷 재사용, 오래된 경우에만 1회 조회"""
+        # 같은 분에 실행되는 주기 작업들은 첫 작업이 조회한 스냅샷을 공유
+        async with self.snapshot_lock:
+            if (self.snapshot_time is not None and
+                    (datetime.now() - self.snapshot_time).total_seconds() < SNAPSHOT_REUSE_SECONDS):
+                return self.market_snapshot
+            async with aiohttp.ClientSession() as session:
+                snapshot = await APIHelper.get_market_snapshot(session)
+            if snapshot is None:
+                # 조회 실패 시 허용 범위 내의 캐시된 스냅샷으로 대체
+                if (self.snapshot_time is not None and
+                        (datetime.now() - self.snapshot_time).total_seconds() <= SNAPSHOT_MAX_AGE_SECONDS):
+                    logger.warning(f"스냅샷 조회 실패, {self.snapshot_time} 기준 캐시 사용")
+                    return self.market_snapshot
+                return None
+            self.update_snapshot(snapshot)
+            return snapshot
+
+    async def refresh_snapshot(self):
+        """인라인 조회용 시장 스냅샷 캐시 갱신"""
+        await self.get_snapshot()
+
+    def update_snapshot(self, snapshot):
+        """스냅샷 캐시 및 정렬된 심볼 목록 교체"""
+        if snapshot is None:
+            return
+        self.market_snapshot = snapshot
+        self.snapshot_time = datetime.now()
+        self.universe = sorted((coin.upper(), coin) for coin in snapshot)
+
+    def match_symbols(self, prefix):
+        """캐시된 심볼 중 접두사가 일치하는 코인 목록 (대소문자 무시)"""
+        prefix = prefix.upper()
+        start = bisect.bisect_left(self.universe, (prefix,))
+        matches = []
+        for key, coin in self.universe[start:start + INLINE_RESULT_LIMIT]:
+            if not key.startswith(prefix):
+                break
+            matches.append(coin)
+        return matches
+
+    @measure_latency
+    async def inline_query(self, update, context):
+        """인라인 조회: 캐시된 스냅샷으로 펀딩비 카드 응답"""
+        query = update.inline_query.query.strip()
+        snapshot = self.market_snapshot
+        snapshot_time = self.snapshot_time
+        stale = (
+            snapshot_time is None or
+            (datetime.now() - snapshot_time).total_seconds() > SNAPSHOT_MAX_AGE_SECONDS
+        )
+        
+        if query:
+            coins = self.match_symbols(query)
+        else:
+            coins = [coin for coin in DEFAULT_CONFIG["coins"] if coin in snapshot]
+        
+        results = []
+        for coin in coins:
+            data = snapshot[coin]
+            apr = get_apr(data['funding_rate'])
+            updated = snapshot_time.strftime("%Y-%m-%d %H:%M:%S")
+            card = f"{format_coin_card(coin, data)}\n🕒 {updated} 기준"
+            title = f"{get_emoji(coin)} {coin}"
+            description = f"{snapshot_time:%H:%M:%S} 기준 | 펀딩비 {data['funding_rate']:+.6f}% | APR {apr:+.2f}%"
+            if stale:
+                card += "\n⚠️ 시세 갱신이 지연되고 있습니다"
+                title = f"⚠️ {title} (지연된 데이터)"
+                description = f"⚠️ {description}"
+            results.append(InlineQueryResultArticle(
+                id=coin,
+                title=title,
+                description=description,
+                input_message_content=InputTextMessageContent(card)
+            ))
+        
+        # 스냅샷이 없거나 오래된 경우 텔레그램에 캐시하지 않음
+        await update.inline_query.answer(
+            results,
+            cache_time=0 if stale else INLINE_CACHE_TIME
+        )
+
+    async def send_funding_rate(self, user_id):
+        """특정 사용자에게 펀딩비 메시지 전송"""
+        try:
+            message = await self.get_funding_rates(user_id)
+            await self.application.bot.send_message(chat_id=user_id, text=message)
+            logger.info(f"메시지 전송 완료 (사용자: {user_id}):\n{message}")
         except Exception as e:
             error_msg = f"메시지 전송 중 오류: {str(e)}"
             logger.error(error_msg)
@@ -431,15 +630,28 @@ class FundingBot:
             
             # 봇 초기화
             self._running = True
+            self.load_report_buckets()
             await self.start()
             
             # 스케줄러 설정 및 시작
             self.scheduler = AsyncIOScheduler()  # 여기서 다시 초기화
+            for interval, cron in REPORT_INTERVALS.items():
+                self.scheduler.add_job(
+                    self.send_bucket_report,
+                    'cron',
+                    args=[interval],
+                    id=f"report_{interval}",
+                    misfire_grace_time=None,
+                    **cron
+                )
             self.scheduler.add_job(
-                self.send_funding_rate,
-                'cron',
-                minute=59,
-                misfire_grace_time=None
+                self.refresh_snapshot,
+                'interval',
+                seconds=SNAPSHOT_REFRESH_SECONDS,
+                id="snapshot_refresh",
+                next_run_time=datetime.now(),
+                max_instances=1,
+                coalesce=True
             )
             self.scheduler.start()
             